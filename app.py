@@ -7,20 +7,31 @@ Created: 2025-12-02
 
 import os
 import logging
-from datetime import datetime
-from flask import Flask, request, jsonify, send_file, render_template
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from urllib.parse import quote
+from cachetools import TTLCache
+from flask import Flask, Request, current_app, request, jsonify, send_file, render_template
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, create_access_token, get_jwt_identity
+from flask_jwt_extended import JWTManager, create_access_token
+from flask_limiter import Limiter
+from sqlalchemy import func, select
 from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.utils import send_file as werkzeug_send_file
 
 from config import config
-from models import db, User, ApiKey, FormSubmission, FileUpload
+from models import db, User, ApiKey, FormSubmission, FileUpload, create_missing_indexes
 from email_service import EmailService
 from keep_alive import KeepAliveService
-from auth import jwt_required_custom
+from auth import jwt_required_custom, get_current_user as get_current_identity
 from utils import (
     allowed_file, save_uploaded_file, success_response, 
-    error_response, validate_email, sanitize_form_data, get_client_ip
+    error_response, validate_email, sanitize_form_data, get_client_ip,
+    OrjsonProvider, UPLOAD_BUFFER_SIZE
 )
 
 # Configure logging
@@ -30,16 +41,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Rate limiter; counters live in RATELIMIT_STORAGE_URI (Redis when configured).
+# Keys use the client address resolved by ProxyFix (TRUSTED_PROXY_COUNT), never
+# a raw X-Forwarded-For value the client could vary to dodge its limits.
+limiter = Limiter(key_func=lambda: get_client_ip(request))
+
+# Snapshot of the API key fields needed by the public submission endpoint
+ApiKeyEntry = namedtuple('ApiKeyEntry', ['id', 'name', 'recipient_email', 'is_active'])
+
+# API key string -> ApiKeyEntry, invalidated when a key is updated or deleted.
+# Invalidation only reaches this process, so the TTL bounds how long other
+# workers may keep accepting a deactivated key.
+_api_key_cache = TTLCache(maxsize=10000, ttl=30)
+_api_key_cache_lock = threading.Lock()
+
+
+class UploadRequest(Request):
+    """Request class that spools file uploads into the upload folder."""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # Keep uploads up to UPLOAD_BUFFER_SIZE in memory, then roll over to
+        # a temp file on the same filesystem the upload is copied to
+        return tempfile.SpooledTemporaryFile(
+            max_size=UPLOAD_BUFFER_SIZE,
+            mode='rb+',
+            dir=current_app.config['UPLOAD_FOLDER']
+        )
+
+
+def get_api_key_entry(api_key):
+    """
+    Look up an API key, serving repeat lookups from the in-process cache.
+    
+    Args:
+        api_key: API key string from the request
+        
+    Returns:
+        ApiKeyEntry or None if the key does not exist
+    """
+    with _api_key_cache_lock:
+        entry = _api_key_cache.get(api_key)
+    if entry is not None:
+        return entry
+    
+    # Read just the cached columns; no ORM object is built
+    row = db.session.execute(
+        select(ApiKey.id, ApiKey.name, ApiKey.recipient_email, ApiKey.is_active)
+        .where(ApiKey.key == api_key)
+    ).first()
+    if row is None:
+        return None
+    
+    entry = ApiKeyEntry._make(row)
+    with _api_key_cache_lock:
+        _api_key_cache[api_key] = entry
+    return entry
+
+
+def invalidate_api_key(api_key):
+    """Drop an API key from the lookup cache."""
+    with _api_key_cache_lock:
+        _api_key_cache.pop(api_key, None)
+
 
 def create_app(config_name='default'):
     """Create and configure the Flask application."""
     
     app = Flask(__name__)
+    app.request_class = UploadRequest
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
+    # Resolve the client address from trusted proxy headers once per request
+    trusted_proxies = app.config['TRUSTED_PROXY_COUNT']
+    if trusted_proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
+    
+    # Upload settings are fixed for the lifetime of the app
+    allowed_extensions = frozenset(ext.strip().lower() for ext in app.config['ALLOWED_EXTENSIONS'])
+    upload_folder = app.config['UPLOAD_FOLDER']
+    x_accel_prefix = app.config['X_ACCEL_REDIRECT_PREFIX'].rstrip('/')
+    
     # Initialize extensions
     db.init_app(app)
     
@@ -51,11 +136,48 @@ def create_app(config_name='default'):
          supports_credentials=False)
     
     jwt = JWTManager(app)
+    limiter.init_app(app)
+    submit_rate_limit = f"{app.config['RATE_LIMIT_PER_MINUTE']}/minute"
     
-    # Initialize email service
-    email_service = EmailService(app.config)
+    # Initialize email service (sends run on its own worker pool)
+    email_service = EmailService(app.config, max_workers=app.config['EMAIL_WORKERS'])
     app.email_service = email_service
     
+    def deliver_submission(submission_id, recipient_email, api_key_name):
+        """Send the notification for a stored submission and record the outcome."""
+        with app.app_context():
+            try:
+                submission = db.session.get(FormSubmission, submission_id)
+                if not submission:
+                    logger.warning(f'Submission {submission_id} vanished before email delivery')
+                    return
+                
+                uploaded_files = list(submission.files)
+                success, error_msg = email_service.send_submission_notification(
+                    recipient_email,
+                    api_key_name,
+                    submission.data,
+                    uploaded_files  # Pass FileUpload objects
+                )
+                submission.email_sent = success
+                if not success:
+                    submission.email_error = error_msg
+                
+                # Delete uploaded files after email is sent (temporary storage only)
+                for file_obj in uploaded_files:
+                    try:
+                        if os.path.exists(file_obj.file_path):
+                            os.remove(file_obj.file_path)
+                            logger.info(f'Deleted temporary file: {file_obj.original_filename}')
+                    except Exception as e:
+                        logger.warning(f'Failed to delete file {file_obj.original_filename}: {str(e)}')
+                
+                db.session.commit()
+                
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f'Email delivery error for submission {submission_id}: {str(e)}')
+    
     # Initialize and start keep-alive service (only in production)
     if app.config.get('FLASK_ENV') == 'production':
         keep_alive = KeepAliveService(app.config['APP_URL'])
@@ -116,6 +238,7 @@ def create_app(config_name='default'):
     # Create database tables and default user
     with app.app_context():
         db.create_all()
+        create_missing_indexes()
         create_default_user(app)
     
     # Error handlers
@@ -132,11 +255,20 @@ def create_app(config_name='default'):
     def file_too_large(e):
         return error_response('File size exceeds maximum allowed size', 413)
     
+    @app.errorhandler(429)
+    def rate_limited(e):
+        return error_response('Too many requests, please try again later', 429)
+    
     # ============================================================================
     # PUBLIC API ENDPOINTS
     # ============================================================================
     
-    @app.route('/api/v1/submit/<api_key>', methods=['POST', 'OPTIONS'])
+    @app.route('/api/v1/submit/<api_key>', methods=['POST', 'OPTIONS'], strict_slashes=False)
+    @limiter.limit(
+        lambda: submit_rate_limit,
+        key_func=lambda: f"{request.view_args['api_key']}:{get_client_ip(request)}",
+        methods=['POST']
+    )
     def submit_form(api_key):
         """
         Public endpoint for form submissions.
@@ -153,8 +285,8 @@ def create_app(config_name='default'):
         
         try:
             # Validate API key
-            key_obj = ApiKey.query.filter_by(key=api_key, is_active=True).first()
-            if not key_obj:
+            key_entry = get_api_key_entry(api_key)
+            if not key_entry or not key_entry.is_active:
                 return error_response('Invalid or inactive API key', 401)
             
             # Get form data
@@ -169,22 +301,21 @@ def create_app(config_name='default'):
             
             # Create submission record
             submission = FormSubmission(
-                api_key_id=key_obj.id,
+                api_key_id=key_entry.id,
                 data=form_data,
                 ip_address=get_client_ip(request),
                 user_agent=request.headers.get('User-Agent', '')[:255]
             )
             db.session.add(submission)
-            db.session.flush()  # Get submission ID
             
             # Handle file uploads
-            uploaded_files = []
+            file_records = []
             if request.files:
                 for field_name in request.files:
                     file = request.files[field_name]
                     if file and file.filename:
                         # Validate file
-                        if not allowed_file(file.filename, app.config['ALLOWED_EXTENSIONS']):
+                        if not allowed_file(file.filename, allowed_extensions):
                             return error_response(
                                 f'File type not allowed: {file.filename}',
                                 400
@@ -194,64 +325,53 @@ def create_app(config_name='default'):
                         try:
                             stored_filename, file_path, file_size = save_uploaded_file(
                                 file,
-                                app.config['UPLOAD_FOLDER'],
-                                key_obj.id
+                                upload_folder,
+                                key_entry.id
                             )
                             
                             # Create file record
                             file_upload = FileUpload(
-                                submission_id=submission.id,
+                                submission=submission,
                                 original_filename=file.filename,
                                 stored_filename=stored_filename,
                                 file_path=file_path,
                                 file_size=file_size,
                                 mime_type=file.content_type
                             )
-                            db.session.add(file_upload)
-                            uploaded_files.append(file_upload)  # Pass object, not dict
+                            file_records.append(file_upload)
                             
                         except Exception as e:
                             logger.error(f'File upload error: {str(e)}')
                             return error_response(f'Failed to upload file: {file.filename}', 500)
             
-            # Send email notification
-            try:
-                success, error_msg = email_service.send_submission_notification(
-                    key_obj.recipient_email,
-                    key_obj.name,
-                    form_data,
-                    uploaded_files  # Pass FileUpload objects
-                )
-                submission.email_sent = success
-                if not success:
-                    submission.email_error = error_msg
-                    
-                # Delete uploaded files after email is sent (temporary storage only)
-                if uploaded_files:
-                    import os
-                    for file_obj in uploaded_files:
-                        try:
-                            if os.path.exists(file_obj.file_path):
-                                os.remove(file_obj.file_path)
-                                logger.info(f'Deleted temporary file: {file_obj.original_filename}')
-                        except Exception as e:
-                            logger.warning(f'Failed to delete file {file_obj.original_filename}: {str(e)}')
-                    
-            except Exception as e:
-                logger.error(f'Email sending error: {str(e)}')
-                submission.email_sent = False
-                submission.email_error = str(e)
+            # Add all file records together so they flush as one batched INSERT
+            if file_records:
+                with db.session.no_autoflush:
+                    db.session.add_all(file_records)
             
             # Update API key usage
-            key_obj.increment_usage()
+            ApiKey.bump_usage(db.session, key_entry.id)
+            
+            # Write everything in one flush, after all file I/O is done,
+            # and read the new ID before commit expires the object
+            db.session.flush()
+            submission_id = submission.id
             
             # Commit all changes
             db.session.commit()
             
-            logger.info(f'Form submission received for API key: {key_obj.name}')
+            logger.info(f'Form submission received for API key: {key_entry.name}')
+            
+            # Email is sent in the background; the worker records email_sent/email_error
+            email_service.submit(
+                deliver_submission,
+                submission_id,
+                key_entry.recipient_email,
+                key_entry.name
+            )
             
             return success_response(
-                data={'submission_id': submission.id},
+                data={'submission_id': submission_id},
                 message='Form submitted successfully',
                 status_code=201
             )
@@ -266,6 +386,7 @@ def create_app(config_name='default'):
     # ============================================================================
     
     @app.route('/api/auth/login', methods=['POST'])
+    @limiter.limit(lambda: app.config['LOGIN_RATE_LIMIT'])
     def login():
         """
         Login endpoint for admin users.
@@ -279,13 +400,20 @@ def create_app(config_name='default'):
             if not data or not data.get('email') or not data.get('password'):
                 return error_response('Email and password required', 400)
             
-            user = User.query.filter_by(email=data['email']).first()
+            user = db.session.execute(
+                select(User).filter_by(email=data['email'])
+            ).scalar_one_or_none()
+            
+            if not user:
+                # Hash anyway so unknown emails take as long as wrong passwords
+                User.check_dummy_password(data['password'])
+                return error_response('Invalid email or password', 401)
             
-            if not user or not user.check_password(data['password']):
+            if not user.check_password(data['password']):
                 return error_response('Invalid email or password', 401)
             
-            # Update last login
-            user.last_login = datetime.utcnow()
+            # Update last login (timestamp taken by the database within the commit)
+            user.last_login = db.func.now()
             db.session.commit()
             
             # Create access token - MUST be string, not integer
@@ -313,9 +441,9 @@ def create_app(config_name='default'):
             JSON response with user data
         """
         try:
-            user_id = get_jwt_identity()
+            user_id = get_current_identity()
             # Convert back to integer since we store it as string in JWT
-            user = User.query.get(int(user_id))
+            user = db.session.get(User, int(user_id))
             
             if not user:
                 return error_response('User not found', 404)
@@ -340,7 +468,10 @@ def create_app(config_name='default'):
             JSON response with list of API keys
         """
         try:
-            keys = ApiKey.query.order_by(ApiKey.created_at.desc()).all()
+            keys = ApiKey.query.options(
+                db.undefer(ApiKey.submission_count),
+                db.raiseload('*')
+            ).order_by(ApiKey.created_at.desc()).all()
             return success_response(data=[key.to_dict() for key in keys])
             
         except Exception as e:
@@ -404,7 +535,7 @@ def create_app(config_name='default'):
             JSON response with updated API key
         """
         try:
-            api_key = ApiKey.query.get(key_id)
+            api_key = db.session.get(ApiKey, key_id)
             if not api_key:
                 return error_response('API key not found', 404)
             
@@ -423,6 +554,7 @@ def create_app(config_name='default'):
                 api_key.is_active = bool(data['is_active'])
             
             db.session.commit()
+            invalidate_api_key(api_key.key)
             
             logger.info(f'API key updated: {api_key.name}')
             
@@ -449,12 +581,13 @@ def create_app(config_name='default'):
             JSON response with success message
         """
         try:
-            api_key = ApiKey.query.get(key_id)
+            api_key = db.session.get(ApiKey, key_id)
             if not api_key:
                 return error_response('API key not found', 404)
             
             db.session.delete(api_key)
             db.session.commit()
+            invalidate_api_key(api_key.key)
             
             logger.info(f'API key deleted: {api_key.name}')
             
@@ -483,7 +616,22 @@ def create_app(config_name='default'):
             per_page = request.args.get('per_page', 20, type=int)
             api_key_id = request.args.get('api_key_id', type=int)
             
-            query = FormSubmission.query
+            # Files for the whole page in one extra query; any other lazy
+            # load from to_dict() raises instead of querying per row
+            query = FormSubmission.query.options(
+                # file_path is server-side only and not part of FileUpload.to_dict()
+                db.selectinload(FormSubmission.files).load_only(
+                    FileUpload.id,
+                    FileUpload.submission_id,
+                    FileUpload.original_filename,
+                    FileUpload.stored_filename,
+                    FileUpload.file_size,
+                    FileUpload.mime_type,
+                    FileUpload.created_at,
+                    raiseload=True
+                ),
+                db.raiseload('*')
+            )
             
             # Filter by API key if specified
             if api_key_id:
@@ -520,7 +668,7 @@ def create_app(config_name='default'):
             JSON response with submission data
         """
         try:
-            submission = FormSubmission.query.get(submission_id)
+            submission = db.session.get(FormSubmission, submission_id)
             if not submission:
                 return error_response('Submission not found', 404)
             
@@ -543,7 +691,7 @@ def create_app(config_name='default'):
             JSON response with success message
         """
         try:
-            submission = FormSubmission.query.get(submission_id)
+            submission = db.session.get(FormSubmission, submission_id)
             if not submission:
                 return error_response('Submission not found', 404)
             
@@ -572,10 +720,25 @@ def create_app(config_name='default'):
             File download
         """
         try:
-            file_upload = FileUpload.query.get(file_id)
+            file_upload = db.session.get(FileUpload, file_id)
             if not file_upload:
                 return error_response('File not found', 404)
             
+            # Hand the transfer to nginx; only headers leave this worker
+            if x_accel_prefix:
+                response = werkzeug_send_file(
+                    file_upload.file_path,
+                    request.environ,
+                    as_attachment=True,
+                    download_name=file_upload.original_filename,
+                    use_x_sendfile=True
+                )
+                relative_path = Path(file_upload.file_path).relative_to(upload_folder).as_posix()
+                del response.headers['X-Sendfile']
+                response.headers['X-Accel-Redirect'] = f'{x_accel_prefix}/{quote(relative_path)}'
+                return response
+            
+            # Honours USE_X_SENDFILE for Apache/lighttpd
             return send_file(
                 file_upload.file_path,
                 as_attachment=True,
@@ -600,24 +763,26 @@ def create_app(config_name='default'):
             JSON response with statistics
         """
         try:
-            total_keys = ApiKey.query.count()
-            active_keys = ApiKey.query.filter_by(is_active=True).count()
-            total_submissions = FormSubmission.query.count()
-            total_files = FileUpload.query.count()
-            
             # Recent submissions (last 7 days)
-            from datetime import timedelta
             week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_submissions = FormSubmission.query.filter(
-                FormSubmission.created_at >= week_ago
-            ).count()
+            
+            # Fetch all counts in a single round-trip
+            stats = db.session.execute(select(
+                select(func.count(ApiKey.id)).scalar_subquery().label('total_keys'),
+                select(func.count(ApiKey.id)).where(ApiKey.is_active.is_(True))
+                    .scalar_subquery().label('active_keys'),
+                select(func.count(FormSubmission.id)).scalar_subquery().label('total_submissions'),
+                select(func.count(FormSubmission.id)).where(FormSubmission.created_at >= week_ago)
+                    .scalar_subquery().label('recent_submissions'),
+                select(func.count(FileUpload.id)).scalar_subquery().label('total_files')
+            )).one()
             
             return success_response(data={
-                'total_api_keys': total_keys,
-                'active_api_keys': active_keys,
-                'total_submissions': total_submissions,
-                'recent_submissions': recent_submissions,
-                'total_files': total_files
+                'total_api_keys': stats.total_keys,
+                'active_api_keys': stats.active_keys,
+                'total_submissions': stats.total_submissions,
+                'recent_submissions': stats.recent_submissions,
+                'total_files': stats.total_files
             })
             
         except Exception as e:
@@ -5,11 +5,66 @@ Author: AI Assistant
 Created: 2025-12-02
 """
 
+import hashlib
+import logging
+import threading
+import time
 from functools import wraps
-from flask import request
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from cachetools import TLRUCache
+from flask import request, g
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from utils import error_response
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on how long a verified token is trusted without re-verification
+TOKEN_CACHE_TTL = 60
+
+
+def _token_expiry(_key, value, now):
+    """Expire cached tokens at their own exp claim, capped at TOKEN_CACHE_TTL."""
+    _identity, exp = value
+    return min(exp, now + TOKEN_CACHE_TTL)
+
+
+# Verified tokens keyed by SHA-256 of the raw Authorization header.
+# Only successfully verified tokens are ever stored.
+_token_cache = TLRUCache(maxsize=10000, ttu=_token_expiry, timer=time.time)
+_token_cache_lock = threading.Lock()
+
+
+def _verify_identity(auth_header):
+    """
+    Verify the request's JWT and return its identity.
+    
+    Repeated requests with the same bearer token are served from the
+    token cache instead of re-running signature verification.
+    
+    Args:
+        auth_header: Raw Authorization header value
+        
+    Returns:
+        User identity from JWT token
+    """
+    token_hash = hashlib.sha256(auth_header.encode()).hexdigest()
+    
+    with _token_cache_lock:
+        cached = _token_cache.get(token_hash)
+    if cached is not None:
+        return cached[0]
+    
+    verify_jwt_in_request()
+    claims = get_jwt()
+    identity = get_jwt_identity()
+    
+    if 'exp' in claims:
+        with _token_cache_lock:
+            _token_cache[token_hash] = (identity, claims['exp'])
+    
+    return identity
+
 
 def jwt_required_custom(fn):
     """
@@ -23,16 +78,18 @@ def jwt_required_custom(fn):
     """
     @wraps(fn)
     def wrapper(*args, **kwargs):
+        # Reject requests without a bearer token before invoking the JWT machinery
+        auth_header = request.headers.get('Authorization')
+        if not auth_header or not auth_header.startswith('Bearer '):
+            return error_response('Authentication required', 401)
+        
         try:
-            verify_jwt_in_request()
-            return fn(*args, **kwargs)
-        except Exception as e:
-            # Log the actual error for debugging
-            import logging
-            logger = logging.getLogger(__name__)
-            logger.error(f'JWT verification failed: {type(e).__name__}: {str(e)}')
-            logger.error(f'Request headers: {dict(request.headers)}')
+            g.jwt_identity = _verify_identity(auth_header)
+        except (JWTExtendedException, PyJWTError) as e:
+            logger.warning(f'JWT verification failed: {type(e).__name__}: {str(e)}')
             return error_response(f'Authentication required: {str(e)}', 401)
+        
+        return fn(*args, **kwargs)
     return wrapper
 
 
@@ -43,7 +100,11 @@ def get_current_user():
     Returns:
         User identity from JWT token
     """
+    identity = g.get('jwt_identity')
+    if identity is not None:
+        return identity
     try:
         return get_jwt_identity()
-    except:
+    except RuntimeError:
+        # No JWT has been verified for this request
         return None
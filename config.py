@@ -6,12 +6,29 @@ Created: 2025-12-02
 """
 
 import os
+import sqlite3
 from pathlib import Path
 from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 # Load environment variables
 load_dotenv()
 
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for a small write-heavy web app."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers run alongside the writer; NORMAL skips the fsync per commit
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+
 class Config:
     """Base configuration class."""
     
@@ -45,15 +62,22 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Database connection pool settings for stability
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_pre_ping': True,  # Test connections before using them
-        'pool_recycle': 300,    # Recycle connections after 5 minutes
-        'pool_size': 5,         # Maximum number of connections
-        'max_overflow': 10,     # Maximum overflow connections
-        'connect_args': {
-            'connect_timeout': 10,  # Connection timeout in seconds
+    if SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'connect_args': {
+                'timeout': 10,  # Seconds to wait for a locked database
+            }
+        }
+    else:
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'pool_pre_ping': True,  # Test connections before using them
+            'pool_recycle': 300,    # Recycle connections after 5 minutes
+            'pool_size': 5,         # Maximum number of connections
+            'max_overflow': 10,     # Maximum overflow connections
+            'connect_args': {
+                'connect_timeout': 10,  # Connection timeout in seconds
+            }
         }
-    }
     
     # Admin user (created on first run)
     ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'admin@example.com')
@@ -72,7 +96,7 @@ class Config:
     
     # Debug: Print to see if key is loaded (will show in Render logs on startup)
     if RESEND_API_KEY:
-        print(f'✅ RESEND_API_KEY loaded: {RESEND_API_KEY[:10]}...')
+        print('✅ RESEND_API_KEY loaded')
     else:
         print('❌ RESEND_API_KEY not found in environment variables!')
 
@@ -80,14 +104,32 @@ class Config:
     # Must be the same email you signed up with at Resend.com
     RESEND_TEST_EMAIL = os.getenv('RESEND_TEST_EMAIL', '')
     
+    # Background threads used to deliver notification emails
+    EMAIL_WORKERS = int(os.getenv('EMAIL_WORKERS', 4))
+    
     # File upload settings
 
     # File upload settings
     MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 10485760))  # 10MB default
     ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'pdf,doc,docx,txt,png,jpg,jpeg,gif,zip').split(','))
     
-    # Rate limiting
+    # Let a front-end web server stream file downloads instead of Python.
+    # USE_X_SENDFILE is for Apache/lighttpd. For nginx, set X_ACCEL_REDIRECT_PREFIX
+    # to an internal location aliased to UPLOAD_FOLDER, e.g. "/protected" with
+    # `location /protected/ { internal; alias /tmp/uploads/; }`
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+    X_ACCEL_REDIRECT_PREFIX = os.getenv('X_ACCEL_REDIRECT_PREFIX', '')
+    
+    # Reverse proxies in front of the app whose X-Forwarded-For /
+    # X-Forwarded-Proto entries are trusted. 0 (no proxy) uses the socket
+    # address, so clients can't pick their own IP with a forged header.
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+    
+    # Rate limiting (submissions are limited per API key and client IP)
     RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', 10))
+    LOGIN_RATE_LIMIT = os.getenv('LOGIN_RATE_LIMIT', '5/minute')
+    # Counter storage; point REDIS_URL at Redis so all workers share the limits
+    RATELIMIT_STORAGE_URI = os.getenv('REDIS_URL', 'memory://')
     
     # Application URL
     APP_URL = os.getenv('APP_URL', 'http://localhost:5000')
@@ -100,6 +142,11 @@ class Config:
         """Initialize application with config."""
         # Create upload folder if it doesn't exist
         os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+        
+        # Apply SQLite pragmas to every new connection
+        if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+            if not event.contains(Engine, 'connect', _set_sqlite_pragmas):
+                event.listen(Engine, 'connect', _set_sqlite_pragmas)
 
 
 class DevelopmentConfig(Config):
@@ -112,6 +159,8 @@ class ProductionConfig(Config):
     """Production configuration."""
     DEBUG = False
     FLASK_ENV = 'production'
+    # Render puts exactly one proxy in front of the app
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 1))
 
 
 # Configuration dictionary
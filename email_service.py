@@ -7,31 +7,225 @@ Created: 2025-12-02
 Updated: 2025-12-04 - Added Resend API integration
 """
 
+import os
+import atexit
 import smtplib
 import logging
-import resend
 import base64
-import socket
+import mmap
+import threading
 import time
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-from pathlib import Path
-from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage, MIMEPart
+from email.utils import formatdate
+from functools import lru_cache
+from markupsafe import escape
+from utils import format_file_size
 
 logger = logging.getLogger(__name__)
 
+RESEND_BASE_URL = 'https://api.resend.com'
+RESEND_API_URL = f'{RESEND_BASE_URL}/emails'
+
+# Read once per process; config.py has already run load_dotenv() by the
+# time app.py imports this module.
+_RESEND_API_KEY = os.getenv('RESEND_API_KEY', '')
+_resend_key_logged = False
+
+
+def _log_resend_key_status():
+    """Log which transport will be used, once per process and without the key."""
+    global _resend_key_logged
+    if _resend_key_logged:
+        return
+    _resend_key_logged = True
+    if _RESEND_API_KEY:
+        logger.info('✅ Resend API key loaded')
+    else:
+        logger.warning('❌ No Resend API key found - will use SMTP fallback')
+
+# Reopen cached SMTP connections after this many seconds; most providers
+# drop idle sessions after a few minutes anyway.
+SMTP_MAX_CONNECTION_AGE = 90
+
+# Providers commonly cap messages per session (Gmail and SES at ~100), so
+# start a fresh connection after this many sends.
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+# Email body templates. The stylesheet and page shell are plain constants;
+# only the small fragments between them are formatted per email.
+_HTML_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        .header {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            padding: 30px;
+            border-radius: 10px 10px 0 0;
+            text-align: center;
+        }
+        .header h1 {
+            margin: 0;
+            font-size: 24px;
+        }
+        .content {
+            background: #f8f9fa;
+            padding: 30px;
+            border-radius: 0 0 10px 10px;
+        }
+        .field {
+            background: white;
+            padding: 15px;
+            margin-bottom: 15px;
+            border-radius: 5px;
+            border-left: 4px solid #667eea;
+        }
+        .field-label {
+            font-weight: 600;
+            color: #667eea;
+            font-size: 12px;
+            text-transform: uppercase;
+            margin-bottom: 5px;
+        }
+        .field-value {
+            color: #333;
+            font-size: 14px;
+            word-wrap: break-word;
+        }
+        .files {
+            margin-top: 20px;
+        }
+        .file-item {
+            background: white;
+            padding: 10px 15px;
+            margin-bottom: 10px;
+            border-radius: 5px;
+            display: flex;
+            align-items: center;
+        }
+        .file-icon {
+            margin-right: 10px;
+            font-size: 20px;
+        }
+        .footer {
+            text-align: center;
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+            color: #666;
+            font-size: 12px;
+        }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📧 New Form Submission</h1>
+        <p style="margin: 10px 0 0 0; opacity: 0.9;">From: """
+
+_HTML_CONTENT_OPEN = """</p>
+    </div>
+    <div class="content">"""
+
+_HTML_FOOTER = """
+    </div>
+    <div class="footer">
+        <p>This email was sent from your Form Service API</p>
+        <p><a href="{app_url}" style="color: #667eea;">View Dashboard</a></p>
+    </div>
+</body>
+</html>
+"""
+
+_HTML_FIELD = """
+        <div class="field">
+            <div class="field-label">{label}</div>
+            <div class="field-value">{value}</div>
+        </div>"""
+
+_HTML_FILES = """
+        <div class="files">
+            <h3 style="color: #667eea; margin-bottom: 15px;">📎 Attached Files</h3>{items}
+        </div>"""
+
+_HTML_FILE_ITEM = """
+            <div class="file-item">
+                <span class="file-icon">📄</span>
+                <div>
+                    <strong>{filename}</strong>
+                    <div style="font-size: 12px; color: #666;">{filesize}</div>
+                </div>
+            </div>"""
+
+_TEXT_RULE = '-' * 50
+
+# Attachment sizes repeat often, so keep recent formatted values
+_format_size = lru_cache(maxsize=1024)(format_file_size)
+
+# Attachments are encoded ~2 MB at a time. The size is a multiple of 57
+# bytes (one 76-character MIME line), so encoded chunks concatenate cleanly.
+_ATTACHMENT_CHUNK_SIZE = 57 * 36792
+
+
+def _encode_file_base64(file_path, wrap=False):
+    """
+    Base64-encode a file in fixed-size chunks.
+    
+    The file is memory-mapped and encoded slice by slice, so the raw bytes
+    are paged in by the OS rather than copied into Python objects.
+    
+    Args:
+        file_path: Path of the file to encode
+        wrap: Break the output into 76-character lines for MIME
+    
+    Returns:
+        str: Encoded file content
+    """
+    encode = base64.encodebytes if wrap else base64.b64encode
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            # mmap cannot map an empty file
+            return ''
+        
+        # Fill a buffer sized up front instead of growing one
+        encoded_size = 4 * -(-size // 3)
+        if wrap:
+            encoded_size += -(-size // 57)
+        buffer = bytearray(encoded_size)
+        pos = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            # Let the kernel read ahead while earlier chunks are encoded
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(0, size, _ATTACHMENT_CHUNK_SIZE):
+                encoded = encode(view[start:start + _ATTACHMENT_CHUNK_SIZE])
+                buffer[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    return buffer.decode('ascii')
+
 
 class EmailService:
     """Service for sending email notifications via Resend API or SMTP."""
     
-    def __init__(self, config):
+    def __init__(self, config, max_workers=4):
         """
         Initialize email service with configuration.
         
         Args:
             config: Flask configuration object
+            max_workers: Number of background sender threads
         """
         # SMTP Configuration (fallback)
         self.smtp_host = getattr(config, 'SMTP_HOST', 'smtp.gmail.com')
@@ -42,15 +236,45 @@ class EmailService:
         self.from_name = getattr(config, 'SMTP_FROM_NAME', 'Form Service')
         self.app_url = getattr(config, 'APP_URL', 'http://localhost:5000')
         
-        # Resend API Configuration - load directly from environment to avoid timing issues
-        import os
-        self.resend_api_key = os.getenv('RESEND_API_KEY', '')
+        # Headers that don't change between sends
+        self._from_header = f'{self.from_name} <{self.from_email}>'
+        self._subject_fmt = 'New Form Submission - {}'.format
+        self._html_footer = _HTML_FOOTER.format(app_url=self.app_url)
+        
+        # Resend API Configuration - read from the environment at import
+        self.resend_api_key = _RESEND_API_KEY
+        _log_resend_key_status()
         
-        # Debug logging
+        # Pooled HTTPS session so Resend calls reuse one TLS connection
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
         if self.resend_api_key:
-            logger.info(f'✅ Resend API key loaded: {self.resend_api_key[:10]}...')
-        else:
-            logger.warning('❌ No Resend API key found - will use SMTP fallback')
+            self._http.headers['Authorization'] = f'Bearer {self.resend_api_key}'
+        
+        # One SMTP connection per sending thread, closed on interpreter exit
+        self._smtp_local = threading.local()
+        self._smtp_conns = set()
+        self._smtp_lock = threading.Lock()
+        atexit.register(self._close_all_smtp)
+        
+        # Background senders; each thread keeps its own SMTP connection
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='email'
+        )
+        
+        # Open the Resend connection now rather than on the first submission
+        if self.resend_api_key:
+            self._pool.submit(self._warm_up_network)
+    
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run fn on the email worker pool.
+        
+        Returns:
+            concurrent.futures.Future: Call .result(timeout) to wait for it
+        """
+        return self._pool.submit(fn, *args, **kwargs)
     
     def send_submission_notification(self, recipient_email, api_key_name, form_data, files=None):
         """
@@ -82,35 +306,31 @@ class EmailService:
     
     def _warm_up_network(self):
         """
-        Perform a lightweight network connection to 'wake up' the network stack.
-        This resolves DNS and establishes a TCP connection without sending data.
-        Does not consume API credits.
+        Open the pooled HTTPS connection to Resend ahead of the first email.
+        The TLS session stays in the pool, so the first real send skips the
+        handshake. Does not consume API credits.
         """
         try:
             logger.info('Network warmup: Connecting to api.resend.com...')
-            sock = socket.create_connection(("api.resend.com", 443), timeout=3)
-            sock.close()
+            self._http.head(RESEND_BASE_URL, timeout=5)
             logger.info('✅ Network warmup successful')
             return True
         except Exception as e:
             logger.warning(f'⚠️ Network warmup failed (proceeding anyway): {str(e)}')
             return False
-
+    
     def _send_via_resend(self, recipient_email, api_key_name, form_data, files=None):
-        """Send email via Resend API using official SDK."""
+        """Send email via the Resend HTTP API over a pooled session."""
         try:
-            # Step 1: Warm up the network connection
-            self._warm_up_network()
-            
-            # Step 2: Set API key
-            resend.api_key = self.resend_api_key
+            # Resend only gets the HTML body
+            _, html_body = self._build_bodies(api_key_name, form_data, files, need_text=False)
             
             # Prepare email data
             email_data = {
-                "from": f'{self.from_name} <{self.from_email}>',
+                "from": self._from_header,
                 "to": [recipient_email],
-                "subject": f'New Form Submission - {api_key_name}',
-                "html": self._create_html_body(api_key_name, form_data, files)
+                "subject": self._subject_fmt(api_key_name),
+                "html": html_body
             }
             
             # Add file attachments if any
@@ -118,22 +338,29 @@ class EmailService:
                 attachments = []
                 for file_obj in files:
                     try:
-                        file_path = Path(file_obj.file_path)
-                        if file_path.exists():
-                            with open(file_path, 'rb') as f:
-                                content = base64.b64encode(f.read()).decode()
-                                attachments.append({
-                                    'filename': file_obj.original_filename,
-                                    'content': content
-                                })
+                        file_path = file_obj.file_path
+                        if os.path.isfile(file_path):
+                            attachments.append({
+                                'filename': file_obj.original_filename,
+                                'content': _encode_file_base64(file_path)
+                            })
                     except Exception as e:
                         logger.warning(f'Failed to attach file {file_obj.original_filename}: {str(e)}')
                 
                 if attachments:
                     email_data['attachments'] = attachments
             
-            # Send via Resend SDK
-            response = resend.Emails.send(email_data)
+            # Send via Resend API
+            response = self._http.post(
+                RESEND_API_URL,
+                json=email_data,
+                timeout=30
+            )
+            
+            if not response.ok:
+                error_msg = f'Resend API error: {response.status_code} - {response.text}'
+                logger.error(error_msg)
+                return False, error_msg
             
             logger.info(f'Email sent successfully via Resend to {recipient_email}')
             return True, None
@@ -147,26 +374,22 @@ class EmailService:
         """Send email via SMTP (fallback method)."""
         try:
             # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f'New Form Submission - {api_key_name}'
-            msg['From'] = f'{self.from_name} <{self.from_email}>'
+            msg = EmailMessage()
+            msg['Subject'] = self._subject_fmt(api_key_name)
+            msg['From'] = self._from_header
             msg['To'] = recipient_email
-            msg['Date'] = datetime.utcnow().strftime('%a, %d %b %Y %H:%M:%S +0000')
+            msg['Date'] = formatdate(usegmt=True)
             
-            # Create HTML body
-            html_body = self._create_html_body(api_key_name, form_data, files)
+            # Create plain text and HTML bodies
+            text_body, html_body = self._build_bodies(api_key_name, form_data, files)
             
-            # Create plain text body
-            text_body = self._create_text_body(api_key_name, form_data, files)
-            
-            # Attach both versions
-            part1 = MIMEText(text_body, 'plain')
-            part2 = MIMEText(html_body, 'html')
-            msg.attach(part1)
-            msg.attach(part2)
+            # Plain text first, HTML as the preferred alternative
+            msg.set_content(text_body)
+            msg.add_alternative(html_body, subtype='html')
             
             # Attach files if any
             if files:
+                msg.make_mixed()
                 for file_obj in files:
                     self._attach_file(msg, file_obj)
             
@@ -181,189 +404,163 @@ class EmailService:
             logger.error(error_msg)
             return False, error_msg
     
-    def _create_html_body(self, api_key_name, form_data, files):
-        """Create HTML email body."""
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 600px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                    color: white;
-                    padding: 30px;
-                    border-radius: 10px 10px 0 0;
-                    text-align: center;
-                }}
-                .header h1 {{
-                    margin: 0;
-                    font-size: 24px;
-                }}
-                .content {{
-                    background: #f8f9fa;
-                    padding: 30px;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .field {{
-                    background: white;
-                    padding: 15px;
-                    margin-bottom: 15px;
-                    border-radius: 5px;
-                    border-left: 4px solid #667eea;
-                }}
-                .field-label {{
-                    font-weight: 600;
-                    color: #667eea;
-                    font-size: 12px;
-                    text-transform: uppercase;
-                    margin-bottom: 5px;
-                }}
-                .field-value {{
-                    color: #333;
-                    font-size: 14px;
-                    word-wrap: break-word;
-                }}
-                .files {{
-                    margin-top: 20px;
-                }}
-                .file-item {{
-                    background: white;
-                    padding: 10px 15px;
-                    margin-bottom: 10px;
-                    border-radius: 5px;
-                    display: flex;
-                    align-items: center;
-                }}
-                .file-icon {{
-                    margin-right: 10px;
-                    font-size: 20px;
-                }}
-                .footer {{
-                    text-align: center;
-                    margin-top: 30px;
-                    padding-top: 20px;
-                    border-top: 1px solid #ddd;
-                    color: #666;
-                    font-size: 12px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📧 New Form Submission</h1>
-                <p style="margin: 10px 0 0 0; opacity: 0.9;">From: {api_key_name}</p>
-            </div>
-            <div class="content">
+    def _build_bodies(self, api_key_name, form_data, files, need_text=True, need_html=True):
         """
+        Render only the email bodies a transport needs.
         
-        # Add form fields
-        for key, value in form_data.items():
-            html += f"""
-                <div class="field">
-                    <div class="field-label">{key}</div>
-                    <div class="field-value">{value}</div>
-                </div>
-            """
+        Args:
+            api_key_name: Name of the API key used
+            form_data: Dictionary of form data
+            files: List of FileUpload objects (optional)
+            need_text: Render the plain text body
+            need_html: Render the HTML body
+            
+        Returns:
+            tuple: (text_body or None, html_body or None)
+        """
+        # Attachment names and sizes are shared by both bodies
+        file_rows = [
+            (
+                getattr(file_obj, 'original_filename', 'file'),
+                self._format_file_size(getattr(file_obj, 'file_size', 0))
+            )
+            for file_obj in files or ()
+        ]
+        text_body = self._create_text_body(api_key_name, form_data, file_rows) if need_text else None
+        html_body = self._create_html_body(api_key_name, form_data, file_rows) if need_html else None
+        return text_body, html_body
+    
+    def _create_html_body(self, api_key_name, form_data, file_rows):
+        """Create HTML email body. Submitted values are HTML-escaped."""
+        fields = ''.join(
+            _HTML_FIELD.format(label=escape(key), value=escape(value))
+            for key, value in form_data.items()
+        )
         
         # Add files if any
-        if files:
-            html += """
-                <div class="files">
-                    <h3 style="color: #667eea; margin-bottom: 15px;">📎 Attached Files</h3>
-            """
-            for file_obj in files:
-                filename = getattr(file_obj, 'original_filename', 'file')
-                filesize = getattr(file_obj, 'file_size', 0)
-                html += f"""
-                    <div class="file-item">
-                        <span class="file-icon">📄</span>
-                        <div>
-                            <strong>{filename}</strong>
-                            <div style="font-size: 12px; color: #666;">
-                                {self._format_file_size(filesize)}
-                            </div>
-                        </div>
-                    </div>
-                """
-            html += "</div>"
+        files_html = ''
+        if file_rows:
+            items = ''.join(
+                _HTML_FILE_ITEM.format(filename=escape(filename), filesize=filesize)
+                for filename, filesize in file_rows
+            )
+            files_html = _HTML_FILES.format(items=items)
         
-        html += f"""
-            </div>
-            <div class="footer">
-                <p>This email was sent from your Form Service API</p>
-                <p><a href="{self.app_url}" style="color: #667eea;">View Dashboard</a></p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+        return ''.join((
+            _HTML_HEAD,
+            escape(api_key_name),
+            _HTML_CONTENT_OPEN,
+            fields,
+            files_html,
+            self._html_footer
+        ))
     
-    def _create_text_body(self, api_key_name, form_data, files):
+    def _create_text_body(self, api_key_name, form_data, file_rows):
         """Create plain text email body."""
-        text = f"New Form Submission\n"
-        text += f"From: {api_key_name}\n"
-        text += f"{'-' * 50}\n\n"
-        
-        for key, value in form_data.items():
-            text += f"{key}:\n{value}\n\n"
-        
-        if files:
-            text += f"\nAttached Files ({len(files)}):\n"
-            for file_obj in files:
-                filename = getattr(file_obj, 'original_filename', 'file')
-                filesize = getattr(file_obj, 'file_size', 0)
-                text += f"- {filename} ({self._format_file_size(filesize)})\n"
+        parts = [f"New Form Submission\nFrom: {api_key_name}\n{_TEXT_RULE}\n\n"]
+        parts.extend(f"{key}:\n{value}\n\n" for key, value in form_data.items())
         
-        text += f"\n{'-' * 50}\n"
-        text += f"View dashboard: {self.app_url}\n"
+        if file_rows:
+            parts.append(f"\nAttached Files ({len(file_rows)}):\n")
+            parts.extend(f"- {filename} ({filesize})\n" for filename, filesize in file_rows)
         
-        return text
+        parts.append(f"\n{_TEXT_RULE}\nView dashboard: {self.app_url}\n")
+        return ''.join(parts)
     
     def _attach_file(self, msg, file_obj):
         """Attach a file to the email message."""
         try:
-            file_path = Path(file_obj.file_path)
+            file_path = file_obj.file_path
             original_filename = file_obj.original_filename
             
-            if file_path.exists():
-                with open(file_path, 'rb') as f:
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(f.read())
-                    encoders.encode_base64(part)
-                    part.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename= {original_filename}'
-                    )
-                    msg.attach(part)
+            if os.path.isfile(file_path):
+                # Payload is already base64, so build the part directly rather
+                # than via add_attachment(), which would need the raw bytes
+                part = MIMEPart()
+                part['Content-Type'] = 'application/octet-stream'
+                part['Content-Transfer-Encoding'] = 'base64'
+                part.add_header('Content-Disposition', 'attachment', filename=original_filename)
+                part.set_payload(_encode_file_base64(file_path, wrap=True))
+                msg.attach(part)
         except Exception as e:
             logger.error(f'Failed to attach file {file_obj.original_filename}: {str(e)}')
     
+    def _open_smtp(self):
+        """Open and authenticate a new SMTP connection."""
+        # Add timeout to prevent worker hanging
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10)
+        server.starttls()
+        if self.smtp_username and self.smtp_password:
+            server.login(self.smtp_username, self.smtp_password)
+        return server
+    
+    def _get_smtp(self):
+        """
+        Return this thread's SMTP connection, opening a new one if there is
+        none, it is older than SMTP_MAX_CONNECTION_AGE, it has carried
+        SMTP_MAX_MESSAGES_PER_CONNECTION messages or it fails a NOOP.
+        """
+        conn = getattr(self._smtp_local, 'conn', None)
+        if conn is not None:
+            expired = (
+                time.monotonic() - self._smtp_local.opened > SMTP_MAX_CONNECTION_AGE
+                or self._smtp_local.sent >= SMTP_MAX_MESSAGES_PER_CONNECTION
+            )
+            try:
+                alive = not expired and conn.noop()[0] == 250
+            except (smtplib.SMTPException, OSError):
+                alive = False
+            if alive:
+                return conn
+            self._close_smtp()
+        
+        conn = self._open_smtp()
+        self._smtp_local.conn = conn
+        self._smtp_local.opened = time.monotonic()
+        self._smtp_local.sent = 0
+        with self._smtp_lock:
+            self._smtp_conns.add(conn)
+        return conn
+    
+    def _close_smtp(self):
+        """Close this thread's SMTP connection, ignoring errors."""
+        conn = getattr(self._smtp_local, 'conn', None)
+        if conn is not None:
+            self._smtp_local.conn = None
+            with self._smtp_lock:
+                self._smtp_conns.discard(conn)
+            try:
+                conn.quit()
+            except Exception:
+                pass
+    
+    def _close_all_smtp(self):
+        """Close every cached SMTP connection (registered with atexit)."""
+        with self._smtp_lock:
+            conns = list(self._smtp_conns)
+            self._smtp_conns.clear()
+        for conn in conns:
+            try:
+                conn.quit()
+            except Exception:
+                pass
+    
     def _send_email(self, msg, recipient):
-        """Send the email via SMTP."""
+        """Send the email via SMTP, reusing this thread's connection when possible."""
         try:
-            # Add timeout to prevent worker hanging
-            with smtplib.SMTP(self.smtp_host, self.smtp_port, timeout=10) as server:
-                server.starttls()
-                if self.smtp_username and self.smtp_password:
-                    server.login(self.smtp_username, self.smtp_password)
-                server.send_message(msg)
+            try:
+                self._get_smtp().send_message(msg)
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException):
+                # Server dropped or rejected the reused connection - reconnect once and retry
+                self._close_smtp()
+                self._get_smtp().send_message(msg)
+            self._smtp_local.sent += 1
         except Exception as e:
             logger.error(f'SMTP error: {str(e)}')
+            self._close_smtp()
             raise
     
-    def _format_file_size(self, size_bytes):
+    @staticmethod
+    def _format_file_size(size_bytes):
         """Format file size in human-readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} TB"
+        return _format_size(size_bytes)
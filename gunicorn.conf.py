@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration, picked up automatically by `gunicorn app:app`.
+
+Every endpoint is I/O-bound (database, SMTP/Resend, file I/O), so workers
+use gevent to serve many concurrent requests per process instead of
+blocking a sync worker on each one.
+"""
+
+import os
+
+worker_class = 'gevent'
+
+# One gevent worker already handles hundreds of concurrent requests; extra
+# workers also duplicate the keep-alive scheduler and startup email.
+workers = int(os.getenv('WEB_CONCURRENCY', 1))
+worker_connections = int(os.getenv('WORKER_CONNECTIONS', 500))
+
+# Reuse client connections across requests
+keepalive = 15
+
+
+def post_fork(server, worker):
+    """Make psycopg2 yield to other greenlets while waiting on PostgreSQL."""
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
@@ -24,22 +24,31 @@ def init_database():
         db.create_all()
         print('✓ Database tables created')
         
-        # Check if admin user exists
+        # Create the admin user in one statement; an existing row is left alone
         admin_email = app.config['ADMIN_EMAIL']
-        existing_user = User.query.filter_by(email=admin_email).first()
+        admin_password = app.config['ADMIN_PASSWORD']
+        user = User(email=admin_email)
+        user.set_password(admin_password)
         
-        if existing_user:
-            print(f'✓ Admin user already exists: {admin_email}')
+        dialect = db.engine.dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
         else:
-            # Create admin user
-            admin_password = app.config['ADMIN_PASSWORD']
-            user = User(email=admin_email)
-            user.set_password(admin_password)
-            db.session.add(user)
-            db.session.commit()
+            from sqlalchemy.dialects.sqlite import insert
+        
+        stmt = insert(User).values(
+            email=user.email,
+            password_hash=user.password_hash
+        ).on_conflict_do_nothing(index_elements=['email'])
+        result = db.session.execute(stmt)
+        db.session.commit()
+        
+        if result.rowcount:
             print(f'✓ Admin user created: {admin_email}')
             print(f'  Password: {admin_password}')
             print('  Please change the password after first login!')
+        else:
+            print(f'✓ Admin user already exists: {admin_email}')
         
         print('\n✓ Database initialization complete!')
 
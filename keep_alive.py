@@ -9,9 +9,10 @@ Created: 2025-12-05
 
 import os
 import logging
-import random
 import requests
+from requests.adapters import HTTPAdapter
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +30,18 @@ class KeepAliveService:
         self.app_url = app_url.rstrip('/')
         self.scheduler = BackgroundScheduler()
         self.is_running = False
+        
+        # Reuse one keep-alive connection between pings
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
     
     def ping_server(self):
         """Ping the server to keep it awake."""
         try:
-            response = requests.get(f'{self.app_url}/', timeout=10)
+            # HEAD wakes the dyno without downloading the dashboard page
+            response = self._session.head(f'{self.app_url}/', timeout=10, allow_redirects=False)
             if response.status_code == 200:
                 logger.info(f'✅ Keep-alive ping successful')
             else:
@@ -41,39 +49,18 @@ class KeepAliveService:
         except Exception as e:
             logger.error(f'❌ Keep-alive ping failed: {str(e)}')
     
-    def schedule_next_ping(self):
-        """Schedule the next ping at a random interval between 4-6 minutes."""
-        # Random interval between 240-360 seconds (4-6 minutes)
-        interval = random.randint(240, 360)
-        logger.info(f'⏰ Next keep-alive ping scheduled in {interval} seconds ({interval/60:.1f} minutes)')
-        
-        # Remove existing job if any
-        if self.scheduler.get_job('keep_alive_ping'):
-            self.scheduler.remove_job('keep_alive_ping')
-        
-        # Schedule the ping using interval trigger
-        from datetime import datetime, timedelta
-        run_time = datetime.now() + timedelta(seconds=interval)
-        
-        self.scheduler.add_job(
-            self.ping_and_reschedule,
-            'date',
-            run_date=run_time,
-            id='keep_alive_ping',
-            replace_existing=True
-        )
-    
-    def ping_and_reschedule(self):
-        """Ping the server and schedule the next ping."""
-        self.ping_server()
-        self.schedule_next_ping()
-    
     def start(self):
         """Start the keep-alive service."""
         if not self.is_running:
             logger.info(f'🚀 Starting keep-alive service for {self.app_url}')
+            # Every 4-6 minutes: 5 minutes +/- 60 seconds of jitter
+            self.scheduler.add_job(
+                self.ping_server,
+                IntervalTrigger(seconds=300, jitter=60),
+                id='keep_alive_ping',
+                replace_existing=True
+            )
             self.scheduler.start()
-            self.schedule_next_ping()
             self.is_running = True
             logger.info('✅ Keep-alive service started')
     
@@ -81,5 +68,6 @@ class KeepAliveService:
         """Stop the keep-alive service."""
         if self.is_running:
             self.scheduler.shutdown()
+            self._session.close()
             self.is_running = False
             logger.info('🛑 Keep-alive service stopped')
@@ -7,13 +7,36 @@ Created: 2025-12-02
 
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 import secrets
-import string
 
 db = SQLAlchemy()
 
 
+def create_missing_indexes():
+    """
+    Create indexes declared on the models but missing from the database.
+    
+    db.create_all() only creates indexes along with new tables, so this
+    brings existing databases up to date with the model definitions.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+# Argon2id with the OWASP-recommended minimum parameters
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
+# Hash of a random password, used to equalize failed login timing. Built at
+# import so the first unknown-email login doesn't also pay for hashing.
+_DUMMY_PASSWORD_HASH = _password_hasher.hash(secrets.token_urlsafe(16))
+
+
 class User(db.Model):
     """Admin user model for dashboard access."""
     
@@ -27,19 +50,50 @@ class User(db.Model):
     
     def set_password(self, password):
         """Hash and set the user password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check if the provided password matches the hash."""
-        return check_password_hash(self.password_hash, password)
+        """
+        Check if the provided password matches the hash.
+        
+        Legacy werkzeug (PBKDF2) hashes and Argon2 hashes with outdated
+        parameters are replaced on success; the caller commits the change.
+        """
+        if not self.password_hash.startswith('$argon2'):
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        
+        try:
+            _password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        
+        if _password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
+    
+    @staticmethod
+    def check_dummy_password(password):
+        """
+        Spend the same hashing work as check_password without a user.
+        
+        Called when no account matches a login so the response time does
+        not reveal whether the email exists.
+        """
+        try:
+            _password_hasher.verify(_DUMMY_PASSWORD_HASH, password)
+        except VerificationError:
+            pass
     
     def to_dict(self):
         """Convert user to dictionary."""
         return {
             'id': self.id,
             'email': self.email,
-            'created_at': self.created_at.isoformat(),
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'created_at': self.created_at,
+            'last_login': self.last_login
         }
 
 
@@ -58,19 +112,31 @@ class ApiKey(db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     usage_count = db.Column(db.Integer, default=0, nullable=False)
     
-    # Relationships
-    submissions = db.relationship('FormSubmission', backref='api_key', lazy='dynamic', cascade='all, delete-orphan')
+    # Relationships (plain lazy load: the collection is only needed for the
+    # delete cascade, and counts come from submission_count)
+    submissions = db.relationship('FormSubmission', backref='api_key', lazy='select', cascade='all, delete-orphan')
     
     @staticmethod
     def generate_key():
-        """Generate a secure random API key."""
-        alphabet = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(48))
+        """Generate a secure random API key (43 URL-safe characters, 256 bits)."""
+        return secrets.token_urlsafe(32)
     
-    def increment_usage(self):
-        """Increment usage count and update last used timestamp."""
-        self.usage_count += 1
-        self.last_used = datetime.utcnow()
+    @classmethod
+    def bump_usage(cls, session, api_key_id):
+        """
+        Increment usage count and update last used timestamp in one UPDATE.
+        
+        The row isn't loaded, and concurrent submissions can't lose counts.
+        
+        Args:
+            session: Database session to execute in
+            api_key_id: ID of the API key that was used
+        """
+        session.execute(
+            update(cls)
+            .where(cls.id == api_key_id)
+            .values(usage_count=cls.usage_count + 1, last_used=datetime.utcnow())
+        )
     
     def to_dict(self):
         """Convert API key to dictionary."""
@@ -80,11 +146,11 @@ class ApiKey(db.Model):
             'name': self.name,
             'description': self.description,
             'recipient_email': self.recipient_email,
-            'created_at': self.created_at.isoformat(),
-            'last_used': self.last_used.isoformat() if self.last_used else None,
+            'created_at': self.created_at,
+            'last_used': self.last_used,
             'is_active': self.is_active,
             'usage_count': self.usage_count,
-            'submission_count': self.submissions.count()
+            'submission_count': self.submission_count
         }
 
 
@@ -92,10 +158,15 @@ class FormSubmission(db.Model):
     """Form submission model to store submitted data."""
     
     __tablename__ = 'form_submissions'
+    __table_args__ = (
+        # Serves per-key listings ordered by newest first
+        db.Index('ix_submission_apikey_created', 'api_key_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    api_key_id = db.Column(db.Integer, db.ForeignKey('api_keys.id'), nullable=False, index=True)
-    data = db.Column(db.JSON, nullable=False)  # Store form data as JSON
+    # Indexed through ix_submission_apikey_created (leading column)
+    api_key_id = db.Column(db.Integer, db.ForeignKey('api_keys.id'), nullable=False)
+    data = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False)  # JSONB on PostgreSQL
     ip_address = db.Column(db.String(45))  # IPv6 compatible
     user_agent = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -103,7 +174,7 @@ class FormSubmission(db.Model):
     email_error = db.Column(db.Text)
     
     # Relationships
-    files = db.relationship('FileUpload', backref='submission', lazy='dynamic', cascade='all, delete-orphan')
+    files = db.relationship('FileUpload', backref='submission', lazy='selectin', cascade='all, delete-orphan')
     
     def to_dict(self, include_files=True):
         """Convert submission to dictionary."""
@@ -113,7 +184,7 @@ class FormSubmission(db.Model):
             'data': self.data,
             'ip_address': self.ip_address,
             'user_agent': self.user_agent,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'email_sent': self.email_sent,
             'email_error': self.email_error
         }
@@ -147,5 +218,16 @@ class FileUpload(db.Model):
             'stored_filename': self.stored_filename,
             'file_size': self.file_size,
             'mime_type': self.mime_type,
-            'created_at': self.created_at.isoformat() if self.created_at else datetime.utcnow().isoformat()
+            'created_at': self.created_at
         }
+
+
+# Number of submissions per key, loaded as a correlated subquery. Deferred so
+# it's only computed when asked for; list queries should undefer() it.
+ApiKey.submission_count = db.column_property(
+    select(func.count(FormSubmission.id))
+    .where(FormSubmission.api_key_id == ApiKey.id)
+    .correlate_except(FormSubmission)
+    .scalar_subquery(),
+    deferred=True
+)